@@ -3,34 +3,338 @@ Grants.gov API Client
 """
 #%% Import modules and libraries
 # First-party libraries
-from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta
-import json
+import asyncio
+import contextlib
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+import functools
+import hashlib
 import logging
+import operator
 import time
 
 # Third-party libraries
-import requests
+from aiolimiter import AsyncLimiter
+from cachetools import LRUCache, TTLCache
+import httpx
+import ijson
+import numpy as np
+import orjson
 from tqdm import tqdm
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, AsyncIterator, Awaitable, Callable, ClassVar, MutableMapping, Protocol, Tuple
 
 # Custom modules
 
 
+#%% Constants
+SEARCH_PAGE_SIZE = 1000  # Maximum rows requested per search2 page.
+RETRY_TOTAL = 5  # Retries after the first attempt for transient failures.
+RETRY_BACKOFF_FACTOR = 0.5  # Exponential backoff base, in seconds: 0.5, 1, 2, 4, ...
+RETRY_BACKOFF_MAX = 120.0  # Upper bound on any single wait, including server-requested ones.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+CACHE_TTLS = {  # Seconds a cached response stays valid, per endpoint name.
+    "search 2" : 300
+    , "fetch opportunity" : 3600
+}
+
+# search2 'oppHits' keys, in GrantOpportunity field order.
+_API_FIELDS = ("id", "number", "title", "agencyCode", "agencyName", "openDate", "closeDate", "oppStatus", "docType", "alnist")
+_get_api_fields = operator.itemgetter(*_API_FIELDS)
+
+# search2 request keys and the search_opportunities arguments that feed them.
+_PARAM_MAP = (
+    ("keyword", "keyword")
+    , ("oppNum", "opp_num")
+    , ("agencies", "agencies")
+    , ("oppStatuses", "opp_statuses")
+    , ("eligibilities", "eligibilities")
+    , ("fundingCategories", "funding_categories")
+    , ("aln", "aln")
+    , ("sortBy", "sort_by")
+)
+_SEARCH_FILTER_NAMES = frozenset(attr for _, attr in _PARAM_MAP)
+_SEARCH_DEFAULTS = {"opp_statuses": "forecasted|posted"}
+
+# Character positions of YYYYMMDD within a MM/DD/YYYY date string.
+_OPEN_DATE_ORDER = [6, 7, 8, 9, 0, 1, 3, 4]
+
+logger = logging.getLogger(__name__)
+
+
 #%% API error exception class.
 class APIError(Exception):
     """Base exception for FAC API errors"""
     pass
 
 
+#%% Retry helpers.
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Purpose:
+        Compute how long to wait before retrying a request.
+    Args:
+        attempt: Zero-based index of the attempt that just failed.
+        retry_after: Value of the response's Retry-After header, if any.
+    Returns:
+        Delay in seconds. A Retry-After given as seconds or as an HTTP date is honored; otherwise exponential
+        backoff is used.
+    """
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), RETRY_BACKOFF_MAX)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=timezone.utc)  # HTTP dates are always GMT.
+            wait_time = (retry_at - datetime.now(timezone.utc)).total_seconds()
+            return min(max(wait_time, 0.0), RETRY_BACKOFF_MAX)
+        except (TypeError, ValueError):
+            tqdm.write(f"Invalid Retry-After header: {retry_after}")
+    return min(RETRY_BACKOFF_FACTOR * (2 ** attempt), RETRY_BACKOFF_MAX)
+
+
+#%% Date helpers.
+@functools.lru_cache(maxsize=4096)
+def _open_date_key(open_date: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Purpose:
+        Parse a Grants.gov MM/DD/YYYY date into a comparable (year, month, day) tuple without strptime.
+        Cached because the same dates repeat heavily across result pages.
+    Args:
+        open_date: Date string as returned by the API.
+    Returns:
+        (year, month, day) tuple, or None if the date is missing or malformed.
+    """
+    if len(open_date) != 10:
+        return None
+    try:
+        return int(open_date[6:10]), int(open_date[0:2]), int(open_date[3:5])
+    except ValueError:
+        return None
+
+
+#%% Request helpers.
+def _build_search_filters(**filters) -> Dict:
+    """
+    Purpose:
+        Translate search_opportunities keyword arguments into the filter portion of a search2 request body,
+        omitting empty filters. Paging helpers build this once and reuse it for every page.
+    Args:
+        filters: Keyword arguments accepted by GrantsGovAPIClient.search_opportunities, minus rows/start_record_num.
+    Returns:
+        search2 filter fields.
+    Raises:
+        TypeError: If an unknown filter is given.
+    """
+    unknown = filters.keys() - _SEARCH_FILTER_NAMES
+    if unknown:
+        raise TypeError(f"Unknown search filter(s): {', '.join(sorted(unknown))}")
+    filters = {**_SEARCH_DEFAULTS, **filters}
+    return {key: value for key, attr in _PARAM_MAP if (value := filters.get(attr))}
+
+
+#%% Streaming helpers.
+async def _aiter_json_items(response: httpx.Response, prefix: str) -> AsyncIterator[Any]:
+    """
+    Purpose:
+        Incrementally parse the JSON items found at `prefix` from a streamed response body, feeding ijson one
+        network chunk at a time.
+    Args:
+        response: Streamed httpx response.
+        prefix: ijson prefix of the items to yield (e.g., 'data.oppHits.item').
+    Yields:
+        Decoded items, as soon as each one is complete.
+    """
+    items = ijson.sendable_list()
+    parser = ijson.items_coro(items, prefix, use_float=True)
+    async for chunk in response.aiter_bytes():
+        parser.send(chunk)
+        for item in items:
+            yield item
+        del items[:]
+    parser.close()  # Flushes the parser and raises if the body was truncated.
+    for item in items:
+        yield item
+
+
+def _compile_search_body(search_filters: Dict) -> Callable[[int, int], bytes]:
+    """
+    Purpose:
+        Specialize search2 request-body encoding for one filter set. The filters are serialized once, and each call
+        only splices in the page's rows and startRecordNum.
+    Args:
+        search_filters: Prebuilt filter fields from _build_search_filters.
+    Returns:
+        Function mapping (start, rows) to the encoded request body.
+    """
+    body_base = orjson.dumps(search_filters, option=orjson.OPT_SORT_KEYS)[:-1]  # Drop the closing '}'.
+    if search_filters:
+        body_base += b","
+
+    def build_body(start: int, rows: int) -> bytes:
+        return body_base + b'"rows":%d,"startRecordNum":%d}' % (rows, start)
+
+    return build_body
+
+
+def _filter_opened_since(hits: List[Dict], opened_since: datetime) -> List[Dict]:
+    """
+    Purpose:
+        Keep the raw 'oppHits' records that opened on or after a date. The dates are filtered in one vectorized NumPy
+        pass: the MM/DD/YYYY characters are reordered to YYYYMMDD, which compares correctly as a string.
+    Args:
+        hits: Raw opportunity records.
+        opened_since: Earliest open date to keep.
+    Returns:
+        The matching records, in their original order. Records without a usable open date are dropped.
+    """
+    if not hits:
+        return []
+    # U11 rather than U10 so longer values are not silently truncated; they are rejected below, like _open_date_key.
+    dates = np.array([hit.get("openDate") or "" for hit in hits], dtype="U11")
+    chars = dates.view("U1").reshape(len(dates), 11)
+    keys = np.ascontiguousarray(chars[:, _OPEN_DATE_ORDER]).view("U8").ravel()
+    mask = (np.char.str_len(dates) == 10) & np.char.isdigit(keys) & (keys >= opened_since.strftime("%Y%m%d"))
+    return [hits[i] for i in np.flatnonzero(mask)]
+
+
+#%% Response cache stores.
+class Store(Protocol):
+    """Minimal key/value interface used by the response cache."""
+    def get(self, key: str) -> Optional[Any]: ...
+    def set(self, key: str, value: Any, ttl: float) -> None: ...
+
+
+class MemoryStore:
+    """
+    In-process response store backed by a cachetools.TTLCache. Values are kept encoded and decoded on every hit, so
+    callers get their own copy (matching RedisStore) and cannot alter what later hits see.
+    """
+    def __init__(self, maxsize: int = 4096):
+        # The TTLCache bounds size and the longest lifetime; each entry also carries its own expiry.
+        self._cache: MutableMapping[str, Tuple[float, bytes]] = TTLCache(maxsize=maxsize, ttl=max(CACHE_TTLS.values()))
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, raw = entry
+        if expires_at < time.monotonic():
+            self._cache.pop(key, None)
+            return None
+        return orjson.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._cache[key] = (time.monotonic() + ttl, orjson.dumps(value))
+
+
+class RedisStore:
+    """
+    Response store backed by a redis.Redis client, so cached responses are shared across processes.
+    Calls are blocking, so the Redis server should be local or low latency.
+    """
+    def __init__(self, client: Any):
+        self._client = client
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(key)
+        return None if raw is None else orjson.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._client.set(key, orjson.dumps(value), ex=int(ttl))
+
+
+#%% Data classes
+@dataclass(slots=True, frozen=True)
+class GrantOpportunity:
+    """
+    A single opportunity hit returned by the search2 endpoint.
+    """
+    id: str
+    number: str
+    title: str
+    agency_code: str
+    agency_name: str
+    open_date: str
+    close_date: str
+    opp_status: str
+    doc_type: str
+    aln_list: List[str] = field(default_factory=list)
+
+    _FIELD_NAMES: ClassVar[Tuple[str, ...]]  # Set once below the class definition.
+
+    @classmethod
+    def from_api_response(cls, data: Dict) -> "GrantOpportunity":
+        """
+        Purpose:
+            Build an opportunity from a search2 'oppHits' record.
+        Args:
+            data: Raw opportunity record.
+        Returns:
+            GrantOpportunity instance.
+        """
+        try:
+            values = _get_api_fields(data)  # Fast path: every key is present.
+        except KeyError:
+            values = tuple(data.get(key, "") for key in _API_FIELDS)
+        return cls(*values[:9], aln_list=values[9] or [])
+
+    @classmethod
+    def from_api_response_batch(cls, records: List[Dict]) -> List["GrantOpportunity"]:
+        """
+        Purpose:
+            Build opportunities from a list of search2 'oppHits' records.
+        Args:
+            records: Raw opportunity records.
+        Returns:
+            List of GrantOpportunity instances, in the same order.
+        """
+        return list(map(cls.from_api_response, records))
+
+    def to_dict(self) -> Dict:
+        """
+        Purpose:
+            Convert the opportunity to a flat dict. Values are not copied, so aln_list is shared with the instance;
+            use copy.deepcopy on the result if it will be mutated.
+        Returns:
+            Field name to value mapping.
+        """
+        return {name: getattr(self, name) for name in self._FIELD_NAMES}
+
+    def to_tuple(self) -> Tuple:
+        """
+        Purpose:
+            Return the field values in declaration order, e.g. for pd.DataFrame.from_records(..., columns=GrantOpportunity._FIELD_NAMES).
+        Returns:
+            Tuple of field values.
+        """
+        return tuple(getattr(self, name) for name in self._FIELD_NAMES)
+
+
+GrantOpportunity._FIELD_NAMES = tuple(f.name for f in fields(GrantOpportunity))
+
+
 #%%
 class GrantsGovAPIClient:
     """
-    Client for interacting with Grants.gov RESTful API
+    Client for interacting with Grants.gov RESTful API.
+
+    The client is asynchronous and must be used as an async context manager so the underlying
+    httpx client is opened and closed cleanly:
+
+        async with GrantsGovAPIClient() as client:
+            details = await client.fetch_opportunity_details(["289999", "290001"])
     """
-    def __init__(self):
+    def __init__(self, max_concurrency: int = 10, max_rate: float = 10, cache_backend: Any = None):
         """
         Initialize the API client
+        Args:
+            max_concurrency: Maximum number of requests allowed in flight at once for bulk helpers.
+            max_rate: Maximum number of requests started per second, shared by all concurrent tasks.
+            cache_backend: Optional redis.Redis instance used to cache responses. Defaults to an in-process cache.
         """
         # URLs
         self.base_url = "https://api.grants.gov/v1/api"
@@ -39,9 +343,37 @@ class GrantsGovAPIClient:
             , "fetch opportunity" : "/fetchOpportunity"
         }
 
-        # Set up session to access API
-        self.session = requests.Session()
-        # self.session.headers.update({})
+        # Session to access API. Created lazily in __aenter__ so it is bound to the running event loop.
+        self._session: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._bucket: Optional[AsyncLimiter] = None
+        self._max_concurrency = max_concurrency
+        self._max_rate = max_rate
+
+        # Response cache keyed on the normalized request payload.
+        self._cache: Store = RedisStore(cache_backend) if cache_backend is not None else MemoryStore()
+        # Validators for conditional requests, keyed like the cache: (ETag, Last-Modified, raw body).
+        self._etags: MutableMapping[str, Tuple[str, str, bytes]] = LRUCache(maxsize=4096)
+        # In-flight detail fetches, so concurrent callers for the same ID share one request.
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    async def __aenter__(self) -> "GrantsGovAPIClient":
+        # HTTP/2 multiplexes concurrent requests over one pooled keep-alive connection, so only the first request
+        # pays the TCP + TLS handshake.
+        self._session = httpx.AsyncClient(
+            http2=True
+            , limits=httpx.Limits(max_connections=20, max_keepalive_connections=20, keepalive_expiry=60)
+            , timeout=httpx.Timeout(30.0, connect=5.0)
+            , headers={"Accept": "application/json", "Content-Type": "application/json"}
+        )
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)  # Cap in-flight requests.
+        self._bucket = AsyncLimiter(self._max_rate, time_period=1.0)  # Token bucket so tasks self-throttle below the API rate limit.
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._session is not None:
+            await self._session.aclose()
+            self._session = None
     
 
     # Base functions.
@@ -66,22 +398,15 @@ class GrantsGovAPIClient:
         output_string = input_string.strip().lower()  # Normalize the string variable.
         return output_string
     
-    def _make_request(self
-                      , endpoint_name: str
-                      , params: Dict = None
-                      , handle_429: bool = False
-                      ) -> List[Dict]:
+    def _endpoint_url(self, endpoint_name: str) -> str:
         """
         Purpose:
-            Make an endpoint specific API request with error handling.
+            Resolve an endpoint name to its full URL.
         Args:
-            endpoint_name: Name of the endpoint (e.g., 'general', 'findings')
-            params: Query parameters to include in the request
-            handle_429: If True, automatically retry on 429 errors indefinitely using Retry-After header
+            endpoint_name: Name of the endpoint (e.g., 'search 2', 'fetch opportunity')
         Returns:
-            List of records from the API.
+            Full URL of the endpoint.
         Raises:
-            APIError: If the API request fails
             ValueError: If endpoint_name is invalid
             TypeError: If endpoint_name is not a string
         """
@@ -92,87 +417,419 @@ class GrantsGovAPIClient:
             raise ValueError(f"Unknown endpoint: '{endpoint_name}'. Available: {available}")
         
         endpoint = self.endpoints.get(f"{endpoint_name}")  # Identify the endpoint to add to the url.
-        url = f"{self.base_url}{endpoint}"  # Add endpoint to the base url.
+        return f"{self.base_url}{endpoint}"  # Add endpoint to the base url.
+    
+    @contextlib.asynccontextmanager
+    async def _post(self
+                    , endpoint_name: str
+                    , body: bytes
+                    , headers: Optional[Dict[str, str]] = None
+                    ) -> AsyncIterator[httpx.Response]:
+        """
+        Purpose:
+            POST a JSON body to an endpoint and yield the successful response so the caller can decide how to read it.
+            Every attempt first takes a token from the client's rate limiter. Connection errors, timeouts and
+            RETRY_STATUSES responses are retried up to RETRY_TOTAL times with exponential backoff, honoring any
+            Retry-After header. Errors raised while the caller reads the body are mapped to APIError as well.
+        Args:
+            endpoint_name: Name of the endpoint (e.g., 'search 2', 'fetch opportunity')
+            body: Encoded JSON request body.
+            headers: Extra request headers.
+        Yields:
+            The open, streamed httpx response. It is closed when the context exits, even if the body was not fully read.
+        Raises:
+            APIError: If the API request fails
+            RuntimeError: If the client is used outside of its async context manager
+        """
+        url = self._endpoint_url(endpoint_name)
+        if self._session is None:
+            raise RuntimeError("Client session is not open. Use 'async with GrantsGovAPIClient() as client:'.")
         
-        while True:
+        for attempt in range(RETRY_TOTAL + 1):
             try:
-                response = self.session.post(url, json=params or {})
-                response.raise_for_status()  # Raises exception for bad status codes.
-                result = response.json()
-
-                if isinstance(result, list):  # FAC API returns data as a list
-                    return result
-                else:
-                    # print(f"Warning: Expected list from {endpoint_name}, got {type(result)}")  # Log unexpected response format
-                    tqdm.write(f"Warning: Expected list from {endpoint_name}, got {type(result)}")  # Log unexpected response format
-                    return []
-            except requests.exceptions.HTTPError as e:
-                if response.status_code == 401:
-                    raise APIError("Authentication failed. Check your API key.") from e
-                if response.status_code == 403:
-                    raise APIError("Authentication failed. Check your API key.") from e
-                elif response.status_code == 404:
-                    raise APIError(f"Endpoint not found: {endpoint_name}") from e
-                elif response.status_code == 429:
-                    if not handle_429:
-                        raise APIError("Rate limit exceeded. Please wait before making more requests.") from e
-                    else:
-                        retry_after = response.headers.get('Retry-After') or response.headers.get('retry-after')
-                        if retry_after:
-                            try:
-                                wait_time = float(retry_after)
-                                
-                                tqdm.write(f"Rate limit hit. Server requested {retry_after}s wait. Waiting {(wait_time ** 2):.1f}s...")
-                                wait_time *= 2  # Double the wait time to be safe.
-                                time.sleep(wait_time)
-                                continue
-                            except ValueError:
-                                print(f"Invalid Retry-After header: {retry_after}")
-                else:
-                    raise APIError(f"HTTP {response.status_code} error for {endpoint_name}: {e}") from e
-            except requests.exceptions.ConnectionError as e:
-                raise APIError(f"Failed to connect to FAC API: {e}") from e
-            except requests.exceptions.Timeout as e:
-                raise APIError(f"Request timeout for {endpoint_name}: {e}") from e
-            except requests.exceptions.RequestException as e:
+                async with self._bucket:
+                    # The session already sends the JSON Content-Type header.
+                    request = self._session.build_request("POST", url, content=body, headers=headers)
+                    response = await self._session.send(request, stream=True)
+            except httpx.TransportError as e:  # Connection errors and timeouts.
+                if attempt < RETRY_TOTAL:
+                    await asyncio.sleep(_retry_delay(attempt))
+                    continue
+                if isinstance(e, httpx.TimeoutException):
+                    raise APIError(f"Request timeout for {endpoint_name}: {e}") from e
+                raise APIError(f"Failed to connect to Grants.gov API: {e}") from e
+            except httpx.HTTPError as e:
                 raise APIError(f"Request failed for {endpoint_name}: {e}") from e
-            except ValueError as e:  # JSON decode error
-                raise APIError(f"Invalid JSON response from {endpoint_name}: {e}") from e
+            if response.status_code == 429:
+                # The rate limiter should prevent this; max_rate is likely set above the plan's limit.
+                logger.error("Rate limit exceeded for %s despite client-side throttling (max_rate=%s).", endpoint_name, self._max_rate)
+            if response.status_code in RETRY_STATUSES and attempt < RETRY_TOTAL:
+                await response.aclose()
+                await asyncio.sleep(_retry_delay(attempt, response.headers.get('Retry-After')))
+                continue
+            break
+        
+        try:
+            if response.status_code != 304:  # httpx treats every non-2xx as an error; 304 answers a conditional request.
+                response.raise_for_status()  # Raises exception for bad status codes.
+            yield response
+        except httpx.HTTPStatusError as e:
+            status_code = e.response.status_code
+            if status_code in (401, 403):
+                raise APIError("Authentication failed. Check your API key.") from e
+            elif status_code == 404:
+                raise APIError(f"Endpoint not found: {endpoint_name}") from e
+            elif status_code == 429:
+                raise APIError("Rate limit exceeded. Please wait before making more requests.") from e
+            else:
+                raise APIError(f"HTTP {status_code} error for {endpoint_name}: {e}") from e
+        except httpx.TimeoutException as e:
+            raise APIError(f"Request timeout for {endpoint_name}: {e}") from e
+        except httpx.HTTPError as e:
+            raise APIError(f"Request failed for {endpoint_name}: {e}") from e
+        except (ValueError, ijson.JSONError) as e:  # JSON decode error
+            raise APIError(f"Invalid JSON response from {endpoint_name}: {e}") from e
+        finally:
+            await response.aclose()
+    
+    async def _make_request(self
+                            , endpoint_name: str
+                            , params: Dict = None
+                            , conditional: bool = False
+                            , body: Optional[bytes] = None
+                            , use_cache: bool = True
+                            ) -> Dict:
+        """
+        Purpose:
+            Make an endpoint specific API request with error handling. Successful responses are cached for the
+            endpoint's CACHE_TTLS lifetime and identical requests are served from the cache.
+        Args:
+            endpoint_name: Name of the endpoint (e.g., 'search 2', 'fetch opportunity')
+            params: JSON body to include in the request
+            body: Pre-encoded JSON body, used instead of params (see compile_search).
+            use_cache: If False, always go to the API and do not store the response (e.g., hit counts that size paging).
+            conditional: If True, remember the response's ETag and Last-Modified headers and send them back as
+                If-None-Match / If-Modified-Since once the cache entry expires. A 304 reuses the stored raw body.
+                Nothing is stored when the server returns neither header.
+        Returns:
+            Decoded JSON response from the API. Each call decodes its own copy, so callers may modify it.
+        Raises:
+            APIError: If the API request fails
+            ValueError: If endpoint_name is invalid
+            TypeError: If endpoint_name is not a string
+            RuntimeError: If the client is used outside of its async context manager
+        """
+        url = self._endpoint_url(endpoint_name)
+        endpoint_name = self._validate_string(endpoint_name)
+
+        if body is None:
+            body = orjson.dumps(params or {}, option=orjson.OPT_SORT_KEYS)  # Sorted so equal params share a cache key.
+        cache_key = hashlib.blake2b(url.encode() + b"\0" + body, digest_size=16).hexdigest()
+        if use_cache:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.debug("X-Cache: HIT %s %s", endpoint_name, cache_key)
+                return cached
+            logger.debug("X-Cache: MISS %s %s", endpoint_name, cache_key)
+        
+        headers = {}
+        validators = self._etags.get(cache_key) if conditional else None
+        if validators is not None:
+            if validators[0]:  # An entry may hold only one of the two validators.
+                headers["If-None-Match"] = validators[0]
+            if validators[1]:
+                headers["If-Modified-Since"] = validators[1]
+        
+        async with self._post(endpoint_name, body, headers=headers) as response:
+            if response.status_code == 304 and validators is not None:
+                logger.debug("304 Not Modified %s %s", endpoint_name, cache_key)
+                etag, last_modified, raw = validators
+            else:
+                raw = await response.aread()
+                etag = response.headers.get("ETag", "")
+                last_modified = response.headers.get("Last-Modified", "")
+            result = orjson.loads(raw)  # Decode from bytes every time so no two callers share one object.
+
+        if isinstance(result, dict):  # Grants.gov API returns data wrapped in a JSON object
+            if use_cache:
+                self._cache.set(cache_key, result, CACHE_TTLS[endpoint_name])
+            if conditional and (etag or last_modified):
+                self._etags[cache_key] = (etag, last_modified, raw)
+            return result
+        else:
+            tqdm.write(f"Warning: Expected dict from {endpoint_name}, got {type(result)}")  # Log unexpected response format
+            return {}
     
 
     # Search2 Endpoint
-    def search2_get_request(self):
-        """
-        """
-        search_params = {
-            "resultType": "json"
-            , "searchOnly": False
-            , "oppNum": ""
-            , "cfda": ""
-            , "sortBy": ""
-            , "oppStatuses": "forecasted|posted|closed|archived"
-            , "startRecordNum": 0
-            , "eligibilities": ""
-            , "fundingInstruments": ""
-            , "fundingCategories": ""
-            , "agencies": ""
-            , "rows": 100
-            , "keyword": ""
-            , "keywordEncoded": True
-        }
-        return self._make_request(endpoint_name='search 2', params=search_params, handle_429=True)
+    async def search_opportunities(self
+                                   , keyword: str = ""
+                                   , opp_num: str = ""
+                                   , agencies: str = ""
+                                   , opp_statuses: str = "forecasted|posted"
+                                   , eligibilities: str = ""
+                                   , funding_categories: str = ""
+                                   , aln: str = ""
+                                   , sort_by: str = ""
+                                   , rows: int = 100
+                                   , start_record_num: int = 0
+                                   ) -> Dict:
+        """
+        Purpose:
+            Search for grant opportunities using the search2 endpoint.
+        Args:
+            keyword: Free-text keyword to search for.
+            opp_num: Opportunity number to search for.
+            agencies: Pipe-delimited agency codes (e.g., 'HHS|DOE').
+            opp_statuses: Pipe-delimited opportunity statuses (e.g., 'forecasted|posted|closed|archived').
+            eligibilities: Pipe-delimited eligibility codes.
+            funding_categories: Pipe-delimited funding category codes.
+            aln: Assistance Listing Number (formerly CFDA).
+            sort_by: Sort order (e.g., 'openDate|desc').
+            rows: Number of records to return.
+            start_record_num: Offset of the first record to return.
+        Returns:
+            Decoded search2 response.
+        """
+        search_filters = _build_search_filters(
+            keyword=keyword
+            , opp_num=opp_num
+            , agencies=agencies
+            , opp_statuses=opp_statuses
+            , eligibilities=eligibilities
+            , funding_categories=funding_categories
+            , aln=aln
+            , sort_by=sort_by
+        )
+        # Same encoder as compile_search and the paging helpers, so equal searches share one cache key.
+        body = _compile_search_body(search_filters)(start_record_num, rows)
+        return await self._make_request(endpoint_name='search 2', body=body)
+    
+    def compile_search(self, **filters) -> Callable[[int, int], Awaitable[Dict]]:
+        """
+        Purpose:
+            Specialize search2 for one filter set that will be paged many times. Filters are validated and encoded once;
+            each call of the returned function only splices the page bounds into the pre-encoded body.
+        Args:
+            filters: Keyword arguments accepted by search_opportunities, minus rows/start_record_num.
+        Returns:
+            Async function taking (start, rows) and returning the decoded search2 response for that page.
+        """
+        build_body = _compile_search_body(_build_search_filters(**filters))
+        return functools.partial(self._search_page, build_body=build_body)
+    
+    async def _search_page(self
+                           , start: int
+                           , rows: int
+                           , build_body: Callable[[int, int], bytes]
+                           , use_cache: bool = True
+                           ) -> Dict:
+        """
+        Purpose:
+            Fetch a single search2 page, honoring the client's concurrency limit.
+        Args:
+            start: Offset of the first record on the page.
+            rows: Number of records on the page.
+            build_body: Request-body encoder from _compile_search_body.
+            use_cache: If False, bypass the response cache.
+        Returns:
+            Decoded search2 response for the page.
+        """
+        async with self._semaphore:
+            return await self._make_request(endpoint_name='search 2', body=build_body(start, rows), use_cache=use_cache)
+    
+    async def _search_page_hits(self
+                                , start: int
+                                , rows: int
+                                , build_body: Callable[[int, int], bytes]
+                                , cutoff: Optional[Tuple[int, int, int]] = None
+                                ) -> Tuple[List[Dict], bool]:
+        """
+        Purpose:
+            Stream a single search2 page and collect its 'oppHits' records one at a time, so the page body is never
+            held in memory as a whole. With a cutoff the page must be sorted newest first; reading stops, and the
+            connection is dropped, at the first record that opened before the cutoff.
+        Args:
+            start: Offset of the first record on the page.
+            rows: Number of records on the page.
+            build_body: Request-body encoder from _compile_search_body.
+            cutoff: Optional (year, month, day) open-date cutoff. Records without a usable open date are skipped.
+        Returns:
+            The collected records, and whether the cutoff was reached.
+        """
+        body = build_body(start, rows)
+        hits = []
+        async with self._semaphore:
+            async with self._post('search 2', body) as response:
+                async with contextlib.aclosing(_aiter_json_items(response, 'data.oppHits.item')) as page_hits:
+                    async for hit in page_hits:
+                        if cutoff is not None:
+                            open_date = _open_date_key(hit.get("openDate") or "")
+                            if open_date is None:
+                                continue  # Skip records without a usable open date.
+                            if open_date < cutoff:
+                                return hits, True
+                        hits.append(hit)
+        return hits, False
+    
+    async def get_opportunities(self, opened_since: Optional[datetime] = None, **filters) -> List[GrantOpportunity]:
+        """
+        Purpose:
+            Retrieve every opportunity matching the filters. A one-row request reads the total hit count,
+            then all pages are requested concurrently. Suited to reporting / ETL pulls; for a short recent window
+            get_new_opportunities stops paging early instead.
+        Args:
+            opened_since: Optional earliest open date. Applied to the raw records in one vectorized pass before any
+                GrantOpportunity is built.
+            filters: Keyword arguments forwarded to search_opportunities.
+        Returns:
+            List of matching opportunities.
+        """
+        build_body = _compile_search_body(_build_search_filters(**filters))
+        head = await self._search_page(0, 1, build_body, use_cache=False)  # A stale count would truncate the pull.
+        total = head.get("data", {}).get("hitCount", 0)
+        pages = [(start, SEARCH_PAGE_SIZE) for start in range(0, total, SEARCH_PAGE_SIZE)]
+        results = await asyncio.gather(*[self._search_page_hits(start, rows, build_body) for start, rows in pages])
+        all_hits = [hit for hits, _ in results for hit in hits]
+        if opened_since is not None:
+            all_hits = _filter_opened_since(all_hits, opened_since)
+        return GrantOpportunity.from_api_response_batch(all_hits)
+    
+    async def get_new_opportunities(self, days_back: int = 7, **filters) -> List[GrantOpportunity]:
+        """
+        Purpose:
+            Retrieve opportunities that opened within the last `days_back` days. Results are requested newest
+            first, so paging stops at the first record older than the cutoff and any pages still queued or in
+            flight are cancelled.
+        Args:
+            days_back: Size of the look-back window in days.
+            filters: Keyword arguments forwarded to search_opportunities. Any 'sort_by' is overridden.
+        Returns:
+            List of newly opened opportunities.
+        """
+        cutoff_date = datetime.now() - timedelta(days=days_back)
+        cutoff = (cutoff_date.year, cutoff_date.month, cutoff_date.day)
+        build_body = _compile_search_body(_build_search_filters(**{**filters, "sort_by": "openDate|desc"}))
+
+        head = await self._search_page(0, 1, build_body, use_cache=False)  # A stale count would truncate the pull.
+        total = head.get("data", {}).get("hitCount", 0)
+        tasks = [
+            asyncio.ensure_future(self._search_page_hits(start, SEARCH_PAGE_SIZE, build_body, cutoff))
+            for start in range(0, total, SEARCH_PAGE_SIZE)
+        ]
+
+        new_hits = []
+        try:
+            for task in tasks:
+                hits, reached_cutoff = await task
+                new_hits.extend(hits)
+                if reached_cutoff:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()  # No-op for pages that already completed.
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return GrantOpportunity.from_api_response_batch(new_hits)
     
 
     # FetchOpportunity Endpoint
-    def fetchOpportunity_get_request(self):
-        return self._make_request(endpoint_name='fetch opportunity', params={}, handle_429=True)
+    async def fetch_opportunity_detail(self, opp_id: str) -> Dict:
+        """
+        Purpose:
+            Fetch the full detail record for a single opportunity. Once the cached copy expires the request is sent
+            conditionally when the server supplied an ETag or Last-Modified, so an unchanged opportunity is not
+            downloaded again. Concurrent calls for the same ID share a single in-flight request, which runs as its
+            own task: cancelling one caller only cancels that caller.
+        Args:
+            opp_id: Grants.gov opportunity ID.
+        Returns:
+            Decoded fetchOpportunity response. Each caller gets its own copy.
+        """
+        task = self._inflight.get(opp_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_opportunity_detail_raw(opp_id))
+            self._inflight[opp_id] = task
+            task.add_done_callback(functools.partial(self._finish_inflight, opp_id))
+
+        raw = await asyncio.shield(task)  # Shield so a cancelled caller does not cancel the shared fetch.
+        return orjson.loads(raw)  # Every caller, the first included, decodes its own copy.
+    
+    async def _fetch_opportunity_detail_raw(self, opp_id: str) -> bytes:
+        """
+        Purpose:
+            Shared body of fetch_opportunity_detail. The result is returned encoded so no caller can alter what
+            the others receive.
+        Args:
+            opp_id: Grants.gov opportunity ID.
+        Returns:
+            Encoded fetchOpportunity response.
+        """
+        # _make_request stores the result in the response cache before the task completes.
+        result = await self._make_request(endpoint_name='fetch opportunity', params={"opportunityId": opp_id}, conditional=True)
+        return orjson.dumps(result)
+    
+    def _finish_inflight(self, opp_id: str, task: asyncio.Future) -> None:
+        """
+        Purpose:
+            Done-callback for a shared detail fetch: drop it from the in-flight map.
+        Args:
+            opp_id: Grants.gov opportunity ID.
+            task: The completed fetch task.
+        """
+        if self._inflight.get(opp_id) is task:
+            del self._inflight[opp_id]
+        if not task.cancelled():
+            task.exception()  # Mark as retrieved; every caller may have been cancelled before it finished.
+    
+    async def fetch_opportunity_details(self, opp_ids: List[str]) -> List[Any]:
+        """
+        Purpose:
+            Fetch the detail records for several opportunities concurrently.
+        Args:
+            opp_ids: Grants.gov opportunity IDs.
+        Returns:
+            One entry per ID, in the same order. Failed lookups are returned as the raised exception
+            rather than aborting the whole batch.
+        """
+        async def fetch_one(opp_id: str) -> Dict:
+            async with self._semaphore:
+                return await self.fetch_opportunity_detail(opp_id)
+
+        tasks = [fetch_one(opp_id) for opp_id in opp_ids]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+#%% Synchronous wrappers
+def search_opportunities(**kwargs) -> Dict:
+    """Blocking wrapper around GrantsGovAPIClient.search_opportunities for scripts and notebooks."""
+    async def _run() -> Dict:
+        async with GrantsGovAPIClient() as client:
+            return await client.search_opportunities(**kwargs)
+    return asyncio.run(_run())
+
+
+def get_new_opportunities(days_back: int = 7, **filters) -> List[GrantOpportunity]:
+    """Blocking wrapper around GrantsGovAPIClient.get_new_opportunities for scripts and notebooks."""
+    async def _run() -> List[GrantOpportunity]:
+        async with GrantsGovAPIClient() as client:
+            return await client.get_new_opportunities(days_back=days_back, **filters)
+    return asyncio.run(_run())
+
+
+def fetch_opportunity_details(opp_ids: List[str]) -> List[Any]:
+    """Blocking wrapper around GrantsGovAPIClient.fetch_opportunity_details for scripts and notebooks."""
+    async def _run() -> List[Any]:
+        async with GrantsGovAPIClient() as client:
+            return await client.fetch_opportunity_details(opp_ids)
+    return asyncio.run(_run())
 
 
 #%% Example usage
 if __name__ == "__main__":
-    client = GrantsGovAPIClient()
-    a = client.search2_get_request()
-    print(a)
+    new_opps = get_new_opportunities(days_back=7)
+    print(f"{len(new_opps)} new opportunities")
+    for opp in new_opps:
+        print(opp.to_dict())
 
 
-#%% End of code.
\ No newline at end of file
+#%% End of code.